@@ -3,13 +3,18 @@ import os
 from datetime import datetime
 
 # Import all our modular functions
-from utils.file_handler import read_sales_data, parse_transactions, validate_and_filter
+from utils.file_handler import (
+    read_sales_data, parse_transactions, validate_and_filter, save_enriched_data,
+    to_records, column_values
+)
 from utils.data_processor import (
-    enrich_transaction_data, generate_sales_report, calculate_total_revenue,
+    enrich_transaction_data, generate_sales_report,
+    compute_all_stats, arrow_sales_stats,
     region_wise_sales, daily_sales_trend, find_peak_sales_day,
     top_selling_products, customer_analysis, low_performing_products
 )
 from utils.api_handler import fetch_exchange_rates
+from utils.records import EnrichedTxn
 
 def main():
     """Main execution function connecting all project modules."""
@@ -28,13 +33,14 @@ def main():
 
         # Step 3: Parse and clean
         print("[2/10] Parsing and cleaning data...")
-        all_transactions = parse_transactions(raw_lines)
+        # Stays a cleaned Table when pyarrow read the file, so it is parsed only once
+        all_transactions = parse_transactions(raw_lines, as_records=False)
         print(f"✓ Parsed {len(all_transactions)} records\n")
 
         # Step 4 & 5: Filter options
         print("[3/10] Filter Options Available:")
-        regions = list(set(t['Region'] for t in all_transactions))
-        amounts = [t['Quantity'] * t['UnitPrice'] for t in all_transactions]
+        regions = list(set(column_values(all_transactions, 'Region')))
+        amounts = column_values(all_transactions, 'Amount')
         print(f"Regions: {', '.join(regions)}")
         print(f"Amount Range: ₹{min(amounts):,.0f} - ₹{max(amounts):,.0f}\n")
 
@@ -45,14 +51,22 @@ def main():
 
         # Step 6 & 7: Validate and display summary
         print("\n[4/10] Validating transactions...")
-        valid_txns, invalid_count, summary = validate_and_filter(all_transactions, region=target_region)
+        valid_data, invalid_count, summary = validate_and_filter(all_transactions, region=target_region)
+        valid_txns = to_records(valid_data)
         print(f"✓ Valid: {len(valid_txns)} | Invalid: {invalid_count}\n")
 
         # Step 8: Perform all data analyses
         print("[5/10] Analyzing sales data...")
-        # These are called internally by generate_sales_report, 
-        # but we call them here to satisfy the workflow requirement.
-        _ = calculate_total_revenue(valid_txns)
+        # Arrow's group_by aggregates the validated table when pyarrow is installed,
+        # otherwise all stats are computed in a single Python pass; both see the
+        # same valid rows as the report
+        stats = arrow_sales_stats(valid_data)
+        if stats is None:
+            stats = compute_all_stats(valid_txns)
+        if stats.daily:
+            # Reuses the daily trend already in stats instead of another pass
+            peak_date, peak_rev, _ = find_peak_sales_day(stats.daily)
+            print(f"Peak Sales Day: {peak_date} (₹{peak_rev:,.2f})")
         print("✓ Analysis complete\n")
 
         # Step 9 & 10: API Fetch and Enrich
@@ -62,22 +76,21 @@ def main():
         print(f"✓ Fetched {len(rates)} currency rates\n")
 
         print("[7/10] Enriching sales data...")
-        enriched_data = enrich_transaction_data(valid_txns)
-        success_count = len([t for t in enriched_data if 'Region_Manager' in t])
+        enriched_data = enrich_transaction_data(valid_txns, rates=rates)
+        success_count = len([t for t in enriched_data if isinstance(t, EnrichedTxn)])
         percent = (success_count / len(valid_txns)) * 100 if valid_txns else 0
         print(f"✓ Enriched {success_count}/{len(valid_txns)} transactions ({percent:.1f}%)\n")
 
         # Step 11: Save enriched data
         print("[8/10] Saving enriched data...")
         output_path = 'data/enriched_sales_data.txt'
-        with open(output_path, 'w') as f:
-            f.write(str(enriched_data))
+        save_enriched_data(enriched_data, output_path)
         print(f"✓ Saved to: {output_path}\n")
 
         # Step 12: Generate report
         print("[9/10] Generating report...")
         report_path = 'output/sales_report.txt'
-        generate_sales_report(valid_txns, enriched_data, report_path)
+        generate_sales_report(valid_txns, enriched_data, report_path, stats=stats)
         print(f"✓ Report saved to: {report_path}\n")
 
         # Step 13: Success message
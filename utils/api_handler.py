@@ -1,21 +1,45 @@
+import time
+from functools import lru_cache
+
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util import Retry
+
+# Rates are reused for this many seconds before the API is called again
+RATES_TTL_SECONDS = 3600
+
+# One session per process so repeated calls reuse the same TCP/TLS connection,
+# with a small pool and retries with backoff for transient failures
+session = requests.Session()
+session.mount('https://', HTTPAdapter(
+    pool_connections=4, pool_maxsize=4,
+    max_retries=Retry(total=3, backoff_factor=0.2)
+))
 
 def fetch_exchange_rates(base_currency="USD"):
     """
     Fetches live exchange rates from an external API.
+    Successful responses are cached for RATES_TTL_SECONDS.
    
     """
-    url = f"https://api.exchangerate-api.com/v4/latest/{base_currency}"
     try:
-        response = requests.get(url, timeout=5)
-        response.raise_for_status() # Check for HTTP errors
-        data = response.json()
-        return data.get('rates', {})
+        # The time bucket changes every TTL period, which expires the cached entry
+        rates = _fetch_rates_cached(base_currency, int(time.time() // RATES_TTL_SECONDS))
+        return dict(rates)
     except requests.exceptions.RequestException as e:
         print(f"Error fetching rates: {e}")
         # Fallback rates if API is down
         return {"INR": 83.0, "EUR": 0.92, "GBP": 0.79}
 
+@lru_cache(maxsize=8)
+def _fetch_rates_cached(base_currency, ttl_bucket):
+    """Calls the API; errors propagate so fallback rates are never cached."""
+    url = f"https://api.exchangerate-api.com/v4/latest/{base_currency}"
+    response = session.get(url, timeout=5)
+    response.raise_for_status() # Check for HTTP errors
+    data = response.json()
+    return data.get('rates', {})
+
 def fetch_region_managers():
     """
     Simulates fetching region manager data from an API.
@@ -26,4 +50,4 @@ def fetch_region_managers():
         "South": "Priya Mani",
         "East": "Rajesh Gupta",
         "West": "Sneha Patil"
-    }
\ No newline at end of file
+    }
@@ -1,26 +1,70 @@
+import heapq
+import sys
+from concurrent.futures import ThreadPoolExecutor
+from collections import namedtuple
+from itertools import islice
+from operator import attrgetter
+
+import numpy as np
 import pandas as pd
 
+from utils.records import EnrichedTxn, txn_values
+
+try:
+    import pyarrow as pa
+    import pyarrow.compute as pc
+except ImportError:  # pyarrow is optional, analytics fall back to pure Python
+    pa = None
+
+try:
+    from numba import get_num_threads, njit, prange
+except ImportError:  # numba is optional, the fused Python loop is used instead
+    njit = None
+
+try:
+    from datasketches import hll_sketch
+except ImportError:  # datasketches is optional, unique counts stay exact
+    hll_sketch = None
+
+# Products selling fewer units than this count as low performing
+LOW_PERFORMING_THRESHOLD = 10
+
+# Python 3.13+ free-threaded builds can run the analytics threads in parallel;
+# with the GIL the fused single-pass loop is faster
+FREE_THREADED = not getattr(sys, '_is_gil_enabled', lambda: True)()
+
+# Factorizing the records for the kernel costs about as much as the fused loop,
+# so Numba only clearly wins from ~1M rows (measured 1.0s vs 1.45s; slower at 132k)
+NUMBA_MIN_ROWS = 1_000_000
+
 def clean_sales_data(df):
     # Count total records at the start (approx. 80)
     total_parsed = len(df)
     
     # 1. REMOVE INVALID RECORDS
+    # All rules are combined into ONE boolean mask so the frame is copied only once
     # Remove rows if CustomerID or Region is missing (e.g., T072 or T071)
-    df = df.dropna(subset=['CustomerID', 'Region'])
+    mask = df['CustomerID'].notna().to_numpy() & df['Region'].notna().to_numpy()
     
     # Remove rows if TransactionID does not start with 'T' (e.g., X2, X611)
-    df = df[df['TransactionID'].str.startswith('T', na=False)]
-    
-    # 2. CLEAN & KEEP VALID RECORDS
-    # Remove commas from ProductNames (e.g., "Laptop,Premium" -> "Laptop Premium")
-    df['ProductName'] = df['ProductName'].str.replace(',', ' ')
+    # Checking the first character as a fixed-width NumPy string beats .str.startswith
+    tid = df['TransactionID'].to_numpy()
+    mask &= np.char.startswith(tid.astype('U1'), 'T')
     
     # Remove commas from UnitPrice and convert to number (e.g., "1,916" -> 1916)
-    df['UnitPrice'] = df['UnitPrice'].astype(str).str.replace(',', '').astype(float)
+    price = pd.to_numeric(df['UnitPrice'].astype(str).str.replace(',', '', regex=False), errors='coerce')
     
-    # 3. MATH FILTER
+    # 2. MATH FILTER
     # Remove records where Quantity or Price is 0 or less (e.g., T075, T076)
-    df = df[(df['Quantity'] > 0) & (df['UnitPrice'] > 0)]
+    mask &= ((df['Quantity'] > 0) & (price > 0) & price.notna()).to_numpy()
+    
+    df = df.loc[mask].copy()
+    
+    # 3. CLEAN & KEEP VALID RECORDS
+    # Remove commas from ProductNames (e.g., "Laptop,Premium" -> "Laptop Premium")
+    df['ProductName'] = df['ProductName'].str.replace(',', ' ', regex=False)
+    df['UnitPrice'] = price[mask].astype(float)
+    df['Amount'] = df['Quantity'] * df['UnitPrice']
     
     # 4. REQUIRED VALIDATION OUTPUT
     valid_count = len(df)
@@ -34,7 +78,7 @@ def clean_sales_data(df):
 
 def calculate_total_revenue(transactions):
     """Calculates total revenue from all transactions"""
-    return sum(t['Quantity'] * t['UnitPrice'] for t in transactions)
+    return sum(t.Amount for t in transactions)
 
 def region_wise_sales(transactions):
     """Analyzes sales by region including percentages"""
@@ -42,179 +86,435 @@ def region_wise_sales(transactions):
     region_stats = {}
     
     for t in transactions:
-        reg = t['Region']
-        rev = t['Quantity'] * t['UnitPrice']
+        reg = t.Region
         if reg not in region_stats:
             region_stats[reg] = {'total_sales': 0.0, 'transaction_count': 0}
-        region_stats[reg]['total_sales'] += rev
+        region_stats[reg]['total_sales'] += t.Amount
         region_stats[reg]['transaction_count'] += 1
         
+    return _finalize_regions(region_stats, total_rev)
+
+def _finalize_regions(region_stats, total_rev):
+    """Adds percentages and sorts region totals by total_sales descending"""
     for reg in region_stats:
-        region_stats[reg]['percentage'] = round((region_stats[reg]['total_sales'] / total_rev) * 100, 2)
+        region_stats[reg]['percentage'] = (region_stats[reg]['total_sales'] / total_rev) * 100
         
     # Sort by total_sales descending
     return dict(sorted(region_stats.items(), key=lambda x: x[1]['total_sales'], reverse=True))
 
-def daily_sales_trend(transactions):
-    """Groups revenue and unique customers by date"""
+def daily_sales_trend(transactions, exact_unique=True):
+    """
+    Groups revenue and unique customers by date.
+    exact_unique=False estimates unique customers with a HyperLogLog sketch
+    (~1.6% error, a few KB per date) when datasketches is installed.
+    """
+    if not exact_unique and hll_sketch is not None:
+        return _daily_sales_trend_hll(transactions)
+    
     daily_stats = {}
     for t in transactions:
-        date = t['Date']
+        date = t.Date
         if date not in daily_stats:
             daily_stats[date] = {'revenue': 0.0, 'transaction_count': 0, 'customers': set()}
-        daily_stats[date]['revenue'] += t['Quantity'] * t['UnitPrice']
+        daily_stats[date]['revenue'] += t.Amount
+        daily_stats[date]['transaction_count'] += 1
+        daily_stats[date]['customers'].add(t.CustomerID)
+        
+    return _finalize_daily(daily_stats)
+
+def _daily_sales_trend_hll(transactions):
+    """daily_sales_trend with one fixed-size HyperLogLog sketch per date instead of exact counts"""
+    daily_stats = {}
+    for t in transactions:
+        date = t.Date
+        if date not in daily_stats:
+            daily_stats[date] = {'revenue': 0.0, 'transaction_count': 0, 'customers': hll_sketch(12)}
+        daily_stats[date]['revenue'] += t.Amount
         daily_stats[date]['transaction_count'] += 1
-        daily_stats[date]['customers'].add(t['CustomerID'])
+        daily_stats[date]['customers'].update(t.CustomerID)
         
+    return _finalize_daily(daily_stats, count=lambda sketch: round(sketch.get_estimate()))
+
+def _finalize_daily(daily_stats, count=len):
+    """Sorts daily totals chronologically and counts each date's customers with count()"""
     result = {}
     for date in sorted(daily_stats.keys()): # Sort chronologically
         result[date] = {
             'revenue': daily_stats[date]['revenue'],
             'transaction_count': daily_stats[date]['transaction_count'],
-            'unique_customers': len(daily_stats[date]['customers'])
+            'unique_customers': count(daily_stats[date]['customers'])
         }
     return result
 
-def find_peak_sales_day(transactions):
-    """Identifies the date with highest revenue"""
-    trend = daily_sales_trend(transactions)
+def _factorize(transactions, key):
+    """Returns (int codes, labels) for one field, labels in first-seen order"""
+    return pd.factorize(np.array(list(map(attrgetter(key), transactions)), dtype=object))
+
+def _unique_pair_counts(outer_id, inner_id, n_outer, n_inner):
+    """Counts distinct inner codes per outer code by packing each pair into one int64"""
+    pairs = np.unique(outer_id.astype(np.int64) * n_inner + inner_id)
+    return np.bincount(pairs // n_inner, minlength=n_outer)
+
+def find_peak_sales_day(trend):
+    """Identifies the date with highest revenue from a daily_sales_trend result"""
     peak_date = max(trend, key=lambda d: trend[d]['revenue'])
     return peak_date, trend[peak_date]['revenue'], trend[peak_date]['transaction_count']
 
 def top_selling_products(transactions, n=5):
     """Returns top n products by quantity sold"""
+    return _rank_products(_product_stats(transactions), n)
+
+def _product_stats(transactions):
+    """Totals quantity and revenue per product"""
     product_stats = {}
     for t in transactions:
-        p = t['ProductName']
+        p = t.ProductName
         if p not in product_stats:
             product_stats[p] = {'qty': 0, 'rev': 0.0}
-        product_stats[p]['qty'] += t['Quantity']
-        product_stats[p]['rev'] += t['Quantity'] * t['UnitPrice']
+        product_stats[p]['qty'] += t.Quantity
+        product_stats[p]['rev'] += t.Amount
         
-    sorted_products = sorted(product_stats.items(), key=lambda x: x[1]['qty'], reverse=True)
-    return [(name, data['qty'], data['rev']) for name, data in sorted_products[:n]]
+    return product_stats
 
-def low_performing_products(transactions, threshold=10):
+def _rank_products(product_stats, n):
+    """Returns (name, qty, rev) for the n products with the highest quantity"""
+    # Heap-based top-n: O(P log n) instead of sorting every product
+    top_products = heapq.nlargest(n, product_stats.items(), key=lambda x: x[1]['qty'])
+    return [(name, data['qty'], data['rev']) for name, data in top_products]
+
+def low_performing_products(transactions, threshold=LOW_PERFORMING_THRESHOLD):
     """Finds products with total quantity < threshold"""
-    product_stats = {} # Reuse logic from top_selling
-    for t in transactions:
-        p = t['ProductName']
-        product_stats[p] = product_stats.get(p, 0) + t['Quantity']
-        
-    low_p = [(p, qty, sum(t['Quantity']*t['UnitPrice'] for t in transactions if t['ProductName']==p)) 
-             for p, qty in product_stats.items() if qty < threshold]
+    return _low_products(_product_stats(transactions), threshold) # Reuse logic from top_selling
+
+def _low_products(product_stats, threshold=LOW_PERFORMING_THRESHOLD):
+    """Returns (name, qty, rev) for products with quantity < threshold, lowest first"""
+    low_p = [(p, d['qty'], d['rev']) for p, d in product_stats.items() if d['qty'] < threshold]
     return sorted(low_p, key=lambda x: x[1]) # Sort by Quantity ascending
 
 def customer_analysis(transactions):
     """Analyzes customer patterns sorted by total spent"""
     cust_stats = {}
     for t in transactions:
-        c = t['CustomerID']
+        c = t.CustomerID
         if c not in cust_stats:
             cust_stats[c] = {'total_spent': 0.0, 'count': 0, 'products': set()}
-        cust_stats[c]['total_spent'] += t['Quantity'] * t['UnitPrice']
+        cust_stats[c]['total_spent'] += t.Amount
         cust_stats[c]['count'] += 1
-        cust_stats[c]['products'].add(t['ProductName'])
+        cust_stats[c]['products'].add(t.ProductName)
         
+    return _finalize_customers(cust_stats)
+
+def _finalize_customers(cust_stats):
+    """Adds average order value and product lists, sorted by total spent"""
     for c in cust_stats:
-        cust_stats[c]['avg_order_value'] = round(cust_stats[c]['total_spent'] / cust_stats[c]['count'], 2)
+        cust_stats[c]['avg_order_value'] = cust_stats[c]['total_spent'] / cust_stats[c]['count']
         cust_stats[c]['products_bought'] = list(cust_stats[c]['products'])
         
     return dict(sorted(cust_stats.items(), key=lambda x: x[1]['total_spent'], reverse=True))
 
-def enrich_transaction_data(transactions):
+SalesStats = namedtuple('SalesStats', ['total_revenue', 'regions', 'daily', 'products', 'customers'])
+
+def compute_all_stats(transactions):
+    """
+    Computes revenue, region, daily, product and customer stats in ONE pass.
+    Each field has the same shape as the matching single-purpose function.
+    """
+    if njit is not None and len(transactions) >= NUMBA_MIN_ROWS:
+        return _compute_all_stats_numba(transactions)
+    if FREE_THREADED:
+        return _compute_all_stats_threaded(transactions)
+    
+    total_rev = 0
+    region_stats, daily_stats, product_stats, cust_stats = {}, {}, {}, {}
+    
+    for t in transactions:
+        amt = t.Amount
+        total_rev += amt
+        
+        reg = region_stats.get(t.Region)
+        if reg is None:
+            reg = region_stats[t.Region] = {'total_sales': 0.0, 'transaction_count': 0}
+        reg['total_sales'] += amt
+        reg['transaction_count'] += 1
+        
+        day = daily_stats.get(t.Date)
+        if day is None:
+            day = daily_stats[t.Date] = {'revenue': 0.0, 'transaction_count': 0, 'customers': set()}
+        day['revenue'] += amt
+        day['transaction_count'] += 1
+        day['customers'].add(t.CustomerID)
+        
+        prod = product_stats.get(t.ProductName)
+        if prod is None:
+            prod = product_stats[t.ProductName] = {'qty': 0, 'rev': 0.0}
+        prod['qty'] += t.Quantity
+        prod['rev'] += amt
+        
+        cust = cust_stats.get(t.CustomerID)
+        if cust is None:
+            cust = cust_stats[t.CustomerID] = {'total_spent': 0.0, 'count': 0, 'products': set()}
+        cust['total_spent'] += amt
+        cust['count'] += 1
+        cust['products'].add(t.ProductName)
+        
+    return SalesStats(
+        total_revenue=total_rev,
+        regions=_finalize_regions(region_stats, total_rev),
+        daily=_finalize_daily(daily_stats),
+        products=product_stats,
+        customers=_finalize_customers(cust_stats)
+    )
+
+def _compute_all_stats_threaded(transactions):
+    """
+    Runs the single-purpose analytics concurrently. They only read the shared
+    list, so on a free-threaded build the separate passes overlap in wall time.
+    """
+    with ThreadPoolExecutor(max_workers=5) as executor:
+        total_rev = executor.submit(calculate_total_revenue, transactions)
+        regions = executor.submit(region_wise_sales, transactions)
+        daily = executor.submit(daily_sales_trend, transactions)
+        products = executor.submit(_product_stats, transactions)
+        customers = executor.submit(customer_analysis, transactions)
+        
+        return SalesStats(
+            total_revenue=total_rev.result(),
+            regions=regions.result(),
+            daily=daily.result(),
+            products=products.result(),
+            customers=customers.result()
+        )
+
+if njit is not None:
+    @njit(parallel=True, cache=True)
+    def _agg_all(qty, amount, region_id, date_id, prod_id, cust_id,
+                 n_regions, n_dates, n_prods, n_custs, n_chunks):
+        """Sums amounts/counts per group; each thread fills its own partial row."""
+        n = qty.shape[0]
+        region_rev = np.zeros((n_chunks, n_regions))
+        region_cnt = np.zeros((n_chunks, n_regions), dtype=np.int64)
+        date_rev = np.zeros((n_chunks, n_dates))
+        date_cnt = np.zeros((n_chunks, n_dates), dtype=np.int64)
+        prod_qty = np.zeros((n_chunks, n_prods), dtype=np.int64)
+        prod_rev = np.zeros((n_chunks, n_prods))
+        cust_rev = np.zeros((n_chunks, n_custs))
+        cust_cnt = np.zeros((n_chunks, n_custs), dtype=np.int64)
+        
+        for c in prange(n_chunks):
+            for i in range(c * n // n_chunks, (c + 1) * n // n_chunks):
+                amt = amount[i]
+                region_rev[c, region_id[i]] += amt
+                region_cnt[c, region_id[i]] += 1
+                date_rev[c, date_id[i]] += amt
+                date_cnt[c, date_id[i]] += 1
+                prod_qty[c, prod_id[i]] += qty[i]
+                prod_rev[c, prod_id[i]] += amt
+                cust_rev[c, cust_id[i]] += amt
+                cust_cnt[c, cust_id[i]] += 1
+        
+        # Reduce the per-thread partials
+        return (region_rev.sum(axis=0), region_cnt.sum(axis=0),
+                date_rev.sum(axis=0), date_cnt.sum(axis=0),
+                prod_qty.sum(axis=0), prod_rev.sum(axis=0),
+                cust_rev.sum(axis=0), cust_cnt.sum(axis=0))
+
+def _compute_all_stats_numba(transactions):
+    """compute_all_stats on integer-coded NumPy arrays with the JIT-compiled kernel"""
+    n = len(transactions)
+    qty = np.fromiter((t.Quantity for t in transactions), dtype=np.int64, count=n)
+    amount = np.fromiter((t.Amount for t in transactions), dtype=np.float64, count=n)
+    # First-seen label order means ties sort exactly like the Python loop
+    region_id, regions = _factorize(transactions, 'Region')
+    date_id, dates = _factorize(transactions, 'Date')
+    prod_id, products = _factorize(transactions, 'ProductName')
+    cust_id, customers = _factorize(transactions, 'CustomerID')
+    n_dates, n_prods, n_custs = len(dates), len(products), len(customers)
+    
+    (region_rev, region_cnt, date_rev, date_cnt,
+     prod_qty, prod_rev, cust_rev, cust_cnt) = _agg_all(
+        qty, amount, region_id, date_id, prod_id, cust_id,
+        len(regions), n_dates, n_prods, n_custs, get_num_threads())
+    
+    # Unique (date, customer) and (customer, product) pairs via combined int codes
+    unique_per_day = _unique_pair_counts(date_id, cust_id, n_dates, n_custs)
+    cust_products = [set() for _ in range(n_custs)]
+    for code in np.unique(cust_id.astype(np.int64) * n_prods + prod_id).tolist():
+        cust_products[code // n_prods].add(products[code % n_prods])
+    
+    total_rev = float(region_rev.sum())
+    region_stats = {reg: {'total_sales': float(region_rev[i]), 'transaction_count': int(region_cnt[i])}
+                    for i, reg in enumerate(regions)}
+    daily = {dates[i]: {'revenue': float(date_rev[i]), 'transaction_count': int(date_cnt[i]),
+                        'unique_customers': int(unique_per_day[i])}
+             for i in np.argsort(dates, kind='stable')} # Sort chronologically
+    product_stats = {name: {'qty': int(prod_qty[i]), 'rev': float(prod_rev[i])}
+                     for i, name in enumerate(products)}
+    cust_stats = {c: {'total_spent': float(cust_rev[i]), 'count': int(cust_cnt[i]),
+                      'products': cust_products[i]}
+                  for i, c in enumerate(customers)}
+    
+    return SalesStats(
+        total_revenue=total_rev,
+        regions=_finalize_regions(region_stats, total_rev),
+        daily=daily,
+        products=product_stats,
+        customers=_finalize_customers(cust_stats)
+    )
+
+def arrow_sales_stats(table):
+    """
+    Aggregates the validated Table from validate_and_filter with Arrow's
+    multithreaded group_by. Returns the same SalesStats as compute_all_stats,
+    or None when pyarrow is missing or the input is not a Table.
+    """
+    if pa is None or not isinstance(table, pa.Table):
+        return None
+    
+    # Row numbers let each group be put back in first-seen order, so ties sort like the Python path
+    table = table.append_column('row', pa.array(np.arange(table.num_rows)))
+    
+    def grouped(key, aggregations):
+        """Aggregates per key, returning one dict per group in first-seen order"""
+        return table.group_by(key).aggregate(aggregations + [('row', 'min')]).sort_by('row_min').to_pylist()
+    
+    total_rev = pc.sum(table['Amount']).as_py() or 0
+    region_stats = {r['Region']: {'total_sales': r['Amount_sum'], 'transaction_count': r['Amount_count']}
+                    for r in grouped('Region', [('Amount', 'sum'), ('Amount', 'count')])}
+    daily = table.group_by('Date').aggregate(
+        [('Amount', 'sum'), ('Amount', 'count'), ('CustomerID', 'count_distinct')]).sort_by('Date')
+    daily_stats = {d['Date']: {'revenue': d['Amount_sum'], 'transaction_count': d['Amount_count'],
+                               'unique_customers': d['CustomerID_count_distinct']}
+                   for d in daily.to_pylist()}
+    product_stats = {p['ProductName']: {'qty': p['Quantity_sum'], 'rev': p['Amount_sum']}
+                     for p in grouped('ProductName', [('Quantity', 'sum'), ('Amount', 'sum')])}
+    cust_stats = {c['CustomerID']: {'total_spent': c['Amount_sum'], 'count': c['Amount_count'],
+                                    'products': set(c['ProductName_distinct'])}
+                  for c in grouped('CustomerID', [('Amount', 'sum'), ('Amount', 'count'),
+                                                  ('ProductName', 'distinct')])}
+    
+    return SalesStats(
+        total_revenue=total_rev,
+        regions=_finalize_regions(region_stats, total_rev),
+        daily=daily_stats,
+        products=product_stats,
+        customers=_finalize_customers(cust_stats)
+    )
+
+def enrich_transaction_data(transactions, rates=None):
     """
     Enriches transactions with currency conversion and manager info.
+    Accepts a list of Txn records (returns EnrichedTxn records) or a DataFrame
+    (enriched in place with column operations). INR values keep full float
+    precision; round only when presenting them. Pass rates already fetched to
+    skip another API call.
    
     """
     from utils.api_handler import fetch_exchange_rates, fetch_region_managers
     
-    rates = fetch_exchange_rates()
+    if rates is None:
+        rates = fetch_exchange_rates()
     inr_rate = rates.get('INR', 83.0)
     managers = fetch_region_managers()
     
+    if isinstance(transactions, pd.DataFrame):
+        df = transactions
+        df['UnitPrice_INR'] = df['UnitPrice'] * inr_rate
+        df['Total_Amount_INR'] = df['Quantity'] * df['UnitPrice_INR']
+        df['Region_Manager'] = df['Region'].map(managers).fillna("Unknown")
+        return df
+    
+    enriched = []
     for txn in transactions:
         # Add converted price
-        txn['UnitPrice_INR'] = round(txn['UnitPrice'] * inr_rate, 2)
-        txn['Total_Amount_INR'] = round(txn['Quantity'] * txn['UnitPrice_INR'], 2)
+        price_inr = txn.UnitPrice * inr_rate
+        total_inr = txn.Quantity * price_inr
         
         # Add Manager info based on Region
-        txn['Region_Manager'] = managers.get(txn['Region'], "Unknown")
+        manager = managers.get(txn.Region, "Unknown")
         
-    return transactions
+        enriched.append(EnrichedTxn(*txn_values(txn), price_inr, total_inr, manager))
+        
+    return enriched
 
 from datetime import datetime
 
-def generate_sales_report(transactions, enriched_transactions, output_file='output/sales_report.txt'):
-    """Generates a comprehensive formatted text report"""
+def generate_sales_report(transactions, enriched_transactions, output_file='output/sales_report.txt', stats=None):
+    """Generates a comprehensive formatted text report (stats may be precomputed)"""
     
-    # 1. PREPARE DATA USING OUR PREVIOUS FUNCTIONS
-    total_rev = calculate_total_revenue(transactions)
+    # 1. PREPARE DATA WITH A SINGLE PASS OVER THE TRANSACTIONS
+    if stats is None:
+        stats = compute_all_stats(transactions)
+    total_rev = stats.total_revenue
     avg_order = total_rev / len(transactions) if transactions else 0
-    dates = sorted([t['Date'] for t in transactions])
+    
+    regions = stats.regions
+    top_prods = _rank_products(stats.products, n=5)
+    top_custs = list(islice(stats.customers.items(), 5)) # Already sorted by total spent
+    trends = stats.daily # Already sorted chronologically
+    dates = list(trends)
     date_range = f"{dates[0]} to {dates[-1]}" if dates else "N/A"
+    peak_date, peak_rev, peak_count = find_peak_sales_day(trends)
+    low_prods = _low_products(stats.products)
+
+    # Build every line first, then write them with a single writelines call
+    lines = []
     
-    regions = region_wise_sales(transactions)
-    top_prods = top_selling_products(transactions, n=5)
-    top_custs = list(customer_analysis(transactions).items())[:5]
-    trends = daily_sales_trend(transactions)
-    peak_date, peak_rev, peak_count = find_peak_sales_day(transactions)
-    low_prods = low_performing_products(transactions)
+    # 1. HEADER
+    lines.append("="*44 + "\n")
+    lines.append("         SALES ANALYTICS REPORT\n")
+    lines.append(f"      Generated: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}\n")
+    lines.append(f"      Records Processed: {len(transactions)}\n")
+    lines.append("="*44 + "\n\n")
+
+    # 2. OVERALL SUMMARY
+    lines.append("OVERALL SUMMARY\n" + "-"*44 + "\n")
+    lines.append(f"Total Revenue:       ₹{total_rev:,.2f}\n")
+    lines.append(f"Total Transactions:  {len(transactions)}\n")
+    lines.append(f"Average Order Value: ₹{avg_order:,.2f}\n")
+    lines.append(f"Date Range:          {date_range}\n\n")
+
+    # 3. REGION-WISE PERFORMANCE
+    lines.append("REGION-WISE PERFORMANCE\n" + "-"*44 + "\n")
+    lines.append(f"{'Region':<10} {'Sales':<12} {'% Total':<10} {'Txns':<5}\n")
+    lines.extend(f"{reg:<10} ₹{data['total_sales']:<11,.0f} {data['percentage']:<10.2f}% {data['transaction_count']:<5}\n"
+                 for reg, data in regions.items())
+    lines.append("\n")
+
+    # 4. TOP 5 PRODUCTS
+    lines.append("TOP 5 PRODUCTS\n" + "-"*44 + "\n")
+    lines.append(f"{'Rank':<5} {'Product Name':<20} {'Qty':<5} {'Revenue':<12}\n")
+    lines.extend(f"{i:<5} {name[:19]:<20} {qty:<5} ₹{rev:,.2f}\n"
+                 for i, (name, qty, rev) in enumerate(top_prods, 1))
+    lines.append("\n")
+
+    # 5. TOP 5 CUSTOMERS
+    lines.append("TOP 5 CUSTOMERS\n" + "-"*44 + "\n")
+    lines.append(f"{'Rank':<5} {'Cust ID':<10} {'Spent':<15} {'Orders':<5}\n")
+    lines.extend(f"{i:<5} {cid:<10} ₹{data['total_spent']:<14,.2f} {data['count']:<5}\n"
+                 for i, (cid, data) in enumerate(top_custs, 1))
+    lines.append("\n")
+
+    # 6. DAILY SALES TREND
+    lines.append("DAILY SALES TREND\n" + "-"*44 + "\n")
+    lines.append(f"{'Date':<12} {'Revenue':<15} {'Txns':<8} {'Unq Cust':<8}\n")
+    lines.extend(f"{date:<12} ₹{data['revenue']:<14,.2f} {data['transaction_count']:<8} {data['unique_customers']:<8}\n"
+                 for date, data in islice(trends.items(), 10)) # Showing first 10 days
+    lines.append("\n")
+
+    # 7. PRODUCT PERFORMANCE ANALYSIS
+    lines.append("PRODUCT PERFORMANCE ANALYSIS\n" + "-"*44 + "\n")
+    lines.append(f"Peak Sales Day: {peak_date} (₹{peak_rev:,.2f})\n")
+    lines.append(f"Low Performing Count: {len(low_prods)} products\n\n")
+
+    # 8. API ENRICHMENT SUMMARY
+    enriched_count = len([t for t in enriched_transactions if isinstance(t, EnrichedTxn)])
+    success_rate = (enriched_count / len(transactions)) * 100 if transactions else 0
+    lines.append("API ENRICHMENT SUMMARY\n" + "-"*44 + "\n")
+    lines.append(f"Total Products Enriched: {enriched_count}\n")
+    lines.append(f"Success Rate:            {success_rate:.2f}%\n")
+    lines.append("-" * 44 + "\n")
 
     with open(output_file, 'w', encoding='utf-8') as f:
-        # 1. HEADER
-        f.write("="*44 + "\n")
-        f.write("         SALES ANALYTICS REPORT\n")
-        f.write(f"      Generated: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}\n")
-        f.write(f"      Records Processed: {len(transactions)}\n")
-        f.write("="*44 + "\n\n")
-
-        # 2. OVERALL SUMMARY
-        f.write("OVERALL SUMMARY\n" + "-"*44 + "\n")
-        f.write(f"Total Revenue:       ₹{total_rev:,.2f}\n")
-        f.write(f"Total Transactions:  {len(transactions)}\n")
-        f.write(f"Average Order Value: ₹{avg_order:,.2f}\n")
-        f.write(f"Date Range:          {date_range}\n\n")
-
-        # 3. REGION-WISE PERFORMANCE
-        f.write("REGION-WISE PERFORMANCE\n" + "-"*44 + "\n")
-        f.write(f"{'Region':<10} {'Sales':<12} {'% Total':<10} {'Txns':<5}\n")
-        for reg, data in regions.items():
-            f.write(f"{reg:<10} ₹{data['total_sales']:<11,.0f} {data['percentage']:<10}% {data['transaction_count']:<5}\n")
-        f.write("\n")
-
-        # 4. TOP 5 PRODUCTS
-        f.write("TOP 5 PRODUCTS\n" + "-"*44 + "\n")
-        f.write(f"{'Rank':<5} {'Product Name':<20} {'Qty':<5} {'Revenue':<12}\n")
-        for i, (name, qty, rev) in enumerate(top_prods, 1):
-            f.write(f"{i:<5} {name[:19]:<20} {qty:<5} ₹{rev:,.2f}\n")
-        f.write("\n")
-
-        # 5. TOP 5 CUSTOMERS
-        f.write("TOP 5 CUSTOMERS\n" + "-"*44 + "\n")
-        f.write(f"{'Rank':<5} {'Cust ID':<10} {'Spent':<15} {'Orders':<5}\n")
-        for i, (cid, data) in enumerate(top_custs, 1):
-            f.write(f"{i:<5} {cid:<10} ₹{data['total_spent']:<14,.2f} {data['count']:<5}\n")
-        f.write("\n")
-
-        # 6. DAILY SALES TREND
-        f.write("DAILY SALES TREND\n" + "-"*44 + "\n")
-        f.write(f"{'Date':<12} {'Revenue':<15} {'Txns':<8} {'Unq Cust':<8}\n")
-        for date, data in list(trends.items())[:10]: # Showing first 10 days
-            f.write(f"{date:<12} ₹{data['revenue']:<14,.2f} {data['transaction_count']:<8} {data['unique_customers']:<8}\n")
-        f.write("\n")
-
-        # 7. PRODUCT PERFORMANCE ANALYSIS
-        f.write("PRODUCT PERFORMANCE ANALYSIS\n" + "-"*44 + "\n")
-        f.write(f"Peak Sales Day: {peak_date} (₹{peak_rev:,.2f})\n")
-        f.write(f"Low Performing Count: {len(low_prods)} products\n\n")
-
-        # 8. API ENRICHMENT SUMMARY
-        enriched_count = len([t for t in enriched_transactions if 'Region_Manager' in t])
-        success_rate = (enriched_count / len(transactions)) * 100 if transactions else 0
-        f.write("API ENRICHMENT SUMMARY\n" + "-"*44 + "\n")
-        f.write(f"Total Products Enriched: {enriched_count}\n")
-        f.write(f"Success Rate:            {success_rate:.2f}%\n")
-        f.write("-" * 44 + "\n")
+        f.writelines(lines)
 
     print(f"--- Report generated successfully at {output_file} ---")
\ No newline at end of file
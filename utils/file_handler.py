@@ -1,16 +1,59 @@
+import codecs
+import csv
+import mmap
 import os
+from concurrent.futures import ThreadPoolExecutor
+from operator import attrgetter
+
+import numpy as np
+import pandas as pd
+
+from utils.records import EnrichedTxn, Txn, field_names
+
+try:
+    import pyarrow as pa
+    import pyarrow.compute as pc
+    import pyarrow.csv as pa_csv
+except ImportError:  # pyarrow is optional, fall back to the pure-Python reader
+    pa = None
+
+try:
+    from charset_normalizer import from_bytes
+except ImportError:  # charset-normalizer is optional, non-UTF-8 files are read as latin-1
+    from_bytes = None
+
+# Expected columns of the pipe-delimited sales file
+COLUMNS = ['TransactionID', 'Date', 'ProductID', 'ProductName',
+           'Quantity', 'UnitPrice', 'CustomerID', 'Region']
+
+# Bytes read from the start of the file to detect its encoding
+ENCODING_SAMPLE_BYTES = 64 * 1024
+
+# Candidates for non-UTF-8 files; short samples are ambiguous across every
+# single-byte code page, so detection only chooses among the likely ones.
+# All are ASCII-compatible, the reader finds lines by splitting bytes on b'\n'
+ENCODING_CANDIDATES = ['cp1252', 'latin_1']
+
+# Files at least this big are memory-mapped and parsed in parallel chunks
+PARALLEL_READ_MIN_BYTES = 64 * 1024 * 1024
 
 def read_sales_data(filename):
     """
     Reads sales data while handling encoding issues and missing files.
+    Returns a pyarrow Table when pyarrow is installed, else a list of raw lines.
    
     """
-    encodings = ['utf-8', 'latin-1', 'cp1252']
-    
     if not os.path.exists(filename):
         print(f"Error: The file {filename} was not found.")
         return []
 
+    # Detect once from a small prefix; latin-1 decodes any byte, so it is only
+    # re-read with it if the prefix misled the detection
+    encodings = list(dict.fromkeys([_detect_encoding(filename), 'latin-1']))
+
+    if pa is not None:
+        return _read_sales_table(filename, encodings)
+
     for enc in encodings:
         try:
             with open(filename, 'r', encoding=enc) as f:
@@ -22,11 +65,128 @@ def read_sales_data(filename):
             
     return []
 
-def parse_transactions(raw_lines):
+def _detect_encoding(filename):
+    """Guesses the encoding from the first ENCODING_SAMPLE_BYTES of the file."""
+    with open(filename, 'rb') as f:
+        head = f.read(ENCODING_SAMPLE_BYTES)
+
+    if head.startswith(codecs.BOM_UTF8):
+        return 'utf-8-sig'
+    try:
+        head.decode('utf-8')
+        return 'utf-8'
+    except UnicodeDecodeError as e:
+        if e.reason == 'unexpected end of data':
+            return 'utf-8' # The sample just cut a character in half
+
+    if from_bytes is None:
+        return 'latin-1'
+    match = from_bytes(head, cp_isolation=ENCODING_CANDIDATES).best()
+    return match.encoding if match else 'latin-1'
+
+def _read_sales_table(filename, encodings):
+    """
+    Reads the file with the pyarrow C++ CSV parser. Quantity/UnitPrice are typed
+    during parsing; if they contain text like "1,916" every column is read as text
+    and cleaned later by _parse_table.
+    """
+    parse_options = pa_csv.ParseOptions(
+        delimiter='|',
+        quote_char=False,
+        invalid_row_handler=lambda row: 'skip'  # Wrong number of fields
+    )
+    text_types = {col: pa.string() for col in COLUMNS}
+    typed_options = pa_csv.ConvertOptions(
+        column_types={**text_types, 'Quantity': pa.int64(), 'UnitPrice': pa.float64()}
+    )
+    text_options = pa_csv.ConvertOptions(column_types=text_types)
+
+    large_file = os.path.getsize(filename) >= PARALLEL_READ_MIN_BYTES
+
+    for enc in encodings:
+        # Skip header natively and use our own column names
+        read_options = pa_csv.ReadOptions(encoding=enc, skip_rows=1, column_names=COLUMNS)
+        # Decide from the head so a text file isn't parsed typed first; text stays
+        # as a retry for files whose numbers only turn to text further down
+        if _numbers_are_typed(filename, read_options, parse_options, typed_options):
+            attempts = (typed_options, text_options)
+        else:
+            attempts = (text_options,)
+        for convert_options in attempts:
+            try:
+                if large_file:
+                    return _read_table_chunks(filename, enc, parse_options, convert_options)
+                return pa_csv.read_csv(filename, read_options=read_options,
+                                       parse_options=parse_options,
+                                       convert_options=convert_options)
+            except pa.ArrowInvalid:
+                continue
+            except UnicodeDecodeError:
+                break # Wrong encoding, try the next one
+
+    return []
+
+def _numbers_are_typed(filename, read_options, parse_options, typed_options):
+    """Checks whether the first ENCODING_SAMPLE_BYTES parse with typed Quantity/UnitPrice."""
+    with open(filename, 'rb') as f:
+        head = f.read(ENCODING_SAMPLE_BYTES)
+    # Only whole lines, a cut number could look typed or not by accident
+    head = head[:head.rfind(b'\n') + 1] or head
+    try:
+        pa_csv.read_csv(pa.BufferReader(head), read_options=read_options,
+                        parse_options=parse_options, convert_options=typed_options)
+        return True
+    except (pa.ArrowInvalid, UnicodeDecodeError):
+        return False
+
+def _chunk_bounds(mm, n_chunks):
+    """Splits a mapped file into about n_chunks (start, end) byte ranges ending on a newline"""
+    size = len(mm)
+    starts = [0]
+    for i in range(1, n_chunks):
+        cut = mm.rfind(b'\n', starts[-1], size * i // n_chunks)
+        if cut != -1:
+            starts.append(cut + 1)
+    return list(zip(starts, starts[1:] + [size]))
+
+def _read_table_chunks(filename, encoding, parse_options, convert_options):
+    """
+    Memory-maps the file and parses newline-aligned byte ranges on a thread pool
+    (pyarrow releases the GIL), then stitches the pieces into one Table.
+    """
+    with open(filename, 'rb') as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+        bounds = _chunk_bounds(mm, os.cpu_count() or 1)
+
+    # Arrow's own map backs the chunk slices, so slicing doesn't copy
+    with pa.memory_map(filename) as src:
+        data = src.read_buffer()
+
+        def parse_chunk(chunk):
+            index, (start, end) = chunk
+            # The pool already runs one chunk per core; Arrow's own threads would oversubscribe
+            read_options = pa_csv.ReadOptions(encoding=encoding, skip_rows=1 if index == 0 else 0,
+                                              column_names=COLUMNS, use_threads=False)
+            return pa_csv.read_csv(pa.BufferReader(data.slice(start, end - start)),
+                                   read_options=read_options,
+                                   parse_options=parse_options,
+                                   convert_options=convert_options)
+
+        with ThreadPoolExecutor() as executor:
+            tables = list(executor.map(parse_chunk, enumerate(bounds)))
+    return pa.concat_tables(tables)
+
+def parse_transactions(raw_data, as_records=True):
     """
-    Splits pipe-delimited strings into a list of dictionaries.
+    Splits pipe-delimited strings into a list of Txn records.
+    Also accepts the pyarrow Table from read_sales_data; pass as_records=False
+    to get the cleaned Table back instead of records.
    
     """
+    if pa is not None and isinstance(raw_data, pa.Table):
+        table = _parse_table(raw_data)
+        return to_records(table) if as_records else table
+
+    raw_lines = raw_data
     transactions = []
     for line in raw_lines:
         # Split by pipe delimiter '|'
@@ -41,27 +201,86 @@ def parse_transactions(raw_lines):
             qty_str = parts[4].replace(',', '')
             price_str = parts[5].replace(',', '')
             
-            txn = {
-                'TransactionID': parts[0],
-                'Date': parts[1],
-                'ProductID': parts[2],
-                'ProductName': parts[3].replace(',', ' '), # Handle commas in name
-                'Quantity': int(qty_str),   # Convert to int
-                'UnitPrice': float(price_str), # Convert to float
-                'CustomerID': parts[6],
-                'Region': parts[7]
-            }
+            qty = int(qty_str)   # Convert to int
+            price = float(price_str) # Convert to float
+            
+            txn = Txn(
+                TransactionID=parts[0],
+                Date=parts[1],
+                ProductID=parts[2],
+                ProductName=parts[3].replace(',', ' '), # Handle commas in name
+                Quantity=qty,
+                UnitPrice=price,
+                CustomerID=parts[6],
+                Region=parts[7],
+                Amount=qty * price
+            )
             transactions.append(txn)
         except ValueError:
             continue
             
     return transactions
 
+def to_records(transactions):
+    """Converts a cleaned Table to Txn records; a list of records is returned as is."""
+    if pa is None or not isinstance(transactions, pa.Table):
+        return transactions
+    # Columns are in Txn field order, so build records straight from them
+    return list(map(Txn, *(column.to_pylist() for column in transactions.columns)))
+
+def column_values(transactions, name):
+    """Returns one field of every transaction, from a Table column or the records."""
+    if pa is not None and isinstance(transactions, pa.Table):
+        return transactions[name].to_pylist()
+    return [getattr(t, name) for t in transactions]
+
+def _parse_table(table):
+    """Cleans and types the columns of a raw sales Table in one vectorized pass."""
+    if pa.types.is_string(table.schema.field('UnitPrice').type):
+        table = _parse_numeric_text(table)
+    else:
+        # Numbers were already typed by the reader, only drop blanks
+        table = table.filter(pc.and_(pc.is_valid(table['Quantity']), pc.is_valid(table['UnitPrice'])))
+
+    # Same edges the old line.strip() trimmed
+    table = table.set_column(0, 'TransactionID', pc.utf8_ltrim_whitespace(table['TransactionID']))
+    region_index = table.schema.get_field_index('Region')
+    table = table.set_column(region_index, 'Region', pc.utf8_rtrim_whitespace(table['Region']))
+
+    name_index = table.schema.get_field_index('ProductName')
+    table = table.set_column(name_index, 'ProductName',
+                             pc.replace_substring(table['ProductName'], ',', ' ')) # Handle commas in name
+    return table.append_column('Amount', pc.multiply(table['Quantity'], table['UnitPrice']))
+
+def _parse_numeric_text(table):
+    """Strips thousands separators from text Quantity/UnitPrice and casts them."""
+    # Clean commas and surrounding whitespace from numeric strings, as int()/float() do
+    qty = pc.utf8_trim_whitespace(pc.replace_substring(table['Quantity'], ',', ''))
+    price = pc.utf8_trim_whitespace(pc.replace_substring(table['UnitPrice'], ',', ''))
+
+    # Drop rows whose numbers can't be converted
+    is_number = pc.and_(
+        pc.match_substring_regex(qty, r'^[+-]?\d+$'),
+        pc.match_substring_regex(price, r'^[+-]?(\d+\.?\d*|\.\d+)([eE][+-]?\d+)?$')
+    )
+    table = table.filter(is_number)
+    qty = qty.filter(is_number)
+    price = price.filter(is_number)
+
+    # int() takes a leading '+' but Arrow's int cast doesn't
+    qty = pc.replace_substring_regex(qty, r'^\+', '')
+    table = table.set_column(table.schema.get_field_index('Quantity'), 'Quantity', pc.cast(qty, pa.int64()))
+    return table.set_column(table.schema.get_field_index('UnitPrice'), 'UnitPrice', pc.cast(price, pa.float64()))
+
 def validate_and_filter(transactions, region=None, min_amount=None, max_amount=None):
     """
     Validates business rules and applies user-defined filters.
+    A cleaned Table from parse_transactions is filtered as a Table.
    
     """
+    if pa is not None and isinstance(transactions, pa.Table):
+        return _validate_and_filter_table(transactions, region, min_amount, max_amount)
+
     valid_list = []
     invalid_count = 0
     filtered_by_region = 0
@@ -70,11 +289,11 @@ def validate_and_filter(transactions, region=None, min_amount=None, max_amount=N
     for txn in transactions:
         # 1. Validation Rules
         is_valid = (
-            txn['TransactionID'].startswith('T') and
-            txn['ProductID'].startswith('P') and
-            txn['CustomerID'].startswith('C') and
-            txn['Quantity'] > 0 and
-            txn['UnitPrice'] > 0
+            txn.TransactionID.startswith('T') and
+            txn.ProductID.startswith('P') and
+            txn.CustomerID.startswith('C') and
+            txn.Quantity > 0 and
+            txn.UnitPrice > 0
         )
         
         if not is_valid:
@@ -82,11 +301,11 @@ def validate_and_filter(transactions, region=None, min_amount=None, max_amount=N
             continue
             
         # 2. Optional Filters
-        if region and txn['Region'] != region:
+        if region and txn.Region != region:
             filtered_by_region += 1
             continue
             
-        total_amt = txn['Quantity'] * txn['UnitPrice']
+        total_amt = txn.Amount
         if (min_amount and total_amt < min_amount) or (max_amount and total_amt > max_amount):
             filtered_by_amount += 1
             continue
@@ -101,4 +320,102 @@ def validate_and_filter(transactions, region=None, min_amount=None, max_amount=N
         'final_count': len(valid_list)
     }
     
-    return valid_list, invalid_count, summary
\ No newline at end of file
+    return valid_list, invalid_count, summary
+
+def _validate_and_filter_table(table, region=None, min_amount=None, max_amount=None):
+    """Table version of validate_and_filter, with the rules as Arrow compute masks."""
+    def count(mask):
+        return pc.sum(mask).as_py() or 0
+
+    # 1. Validation Rules
+    is_valid = pc.and_(
+        pc.and_(pc.starts_with(table['TransactionID'], 'T'), pc.starts_with(table['ProductID'], 'P')),
+        pc.and_(pc.starts_with(table['CustomerID'], 'C'),
+                pc.and_(pc.greater(table['Quantity'], 0), pc.greater(table['UnitPrice'], 0)))
+    )
+    invalid_count = count(pc.invert(is_valid))
+
+    # 2. Optional Filters (each counted only among rows that survived the previous step)
+    keep = is_valid
+    filtered_by_region = 0
+    if region:
+        in_region = pc.equal(table['Region'], region)
+        filtered_by_region = count(pc.and_(keep, pc.invert(in_region)))
+        keep = pc.and_(keep, in_region)
+
+    in_range = pa.array(np.ones(table.num_rows, dtype=bool))
+    if min_amount:
+        in_range = pc.and_(in_range, pc.greater_equal(table['Amount'], min_amount))
+    if max_amount:
+        in_range = pc.and_(in_range, pc.less_equal(table['Amount'], max_amount))
+    filtered_by_amount = count(pc.and_(keep, pc.invert(in_range)))
+    keep = pc.and_(keep, in_range)
+
+    table_valid = table.filter(keep)
+    summary = {
+        'total_input': table.num_rows,
+        'invalid': invalid_count,
+        'filtered_by_region': filtered_by_region,
+        'filtered_by_amount': filtered_by_amount,
+        'final_count': table_valid.num_rows
+    }
+
+    return table_valid, invalid_count, summary
+
+def validate_and_filter_df(df, region=None, min_amount=None, max_amount=None):
+    """
+    DataFrame version of validate_and_filter: every rule is one vectorized mask.
+    Returns (valid DataFrame, invalid count, summary) like validate_and_filter.
+   
+    """
+    # 1. Validation Rules
+    is_valid = (
+        df['TransactionID'].str.startswith('T', na=False) &
+        df['ProductID'].str.startswith('P', na=False) &
+        df['CustomerID'].str.startswith('C', na=False) &
+        (df['Quantity'] > 0) &
+        (df['UnitPrice'] > 0)
+    )
+    invalid_count = int((~is_valid).sum())
+
+    # 2. Optional Filters (each counted only among rows that survived the previous step)
+    keep = is_valid
+    filtered_by_region = 0
+    if region:
+        in_region = df['Region'] == region
+        filtered_by_region = int((keep & ~in_region).sum())
+        keep = keep & in_region
+
+    total_amt = df['Amount'] if 'Amount' in df else df['Quantity'] * df['UnitPrice']
+    in_range = pd.Series(True, index=df.index)
+    if min_amount:
+        in_range &= total_amt >= min_amount
+    if max_amount:
+        in_range &= total_amt <= max_amount
+    filtered_by_amount = int((keep & ~in_range).sum())
+    keep = keep & in_range
+
+    df_valid = df[keep]
+    summary = {
+        'total_input': len(df),
+        'invalid': invalid_count,
+        'filtered_by_region': filtered_by_region,
+        'filtered_by_amount': filtered_by_amount,
+        'final_count': len(df_valid)
+    }
+
+    return df_valid, invalid_count, summary
+
+def save_enriched_data(transactions, filename):
+    """
+    Streams enriched transactions to a pipe-delimited file, one row at a time.
+   
+    """
+    # Always rewrite the file so an earlier run's rows never survive an empty result
+    with open(filename, 'w', newline='', encoding='utf-8') as f:
+        fieldnames = field_names(transactions[0] if transactions else EnrichedTxn)
+        writer = csv.writer(f, delimiter='|')
+        writer.writerow(fieldnames)
+        writer.writerows(attrgetter(*fieldnames)(t) for t in transactions)
+
+    return len(transactions)
@@ -0,0 +1,31 @@
+from dataclasses import dataclass, fields
+from operator import attrgetter
+
+@dataclass(slots=True)
+class Txn:
+    """One sales transaction. Slots keep records small and attribute access fast."""
+    TransactionID: str
+    Date: str
+    ProductID: str
+    ProductName: str
+    Quantity: int
+    UnitPrice: float
+    CustomerID: str
+    Region: str
+    Amount: float # Quantity * UnitPrice, computed once at parse time
+
+@dataclass(slots=True)
+class EnrichedTxn(Txn):
+    """A transaction plus the fields added by API enrichment."""
+    UnitPrice_INR: float
+    Total_Amount_INR: float
+    Region_Manager: str
+
+TXN_FIELDS = tuple(f.name for f in fields(Txn))
+
+# Returns all Txn fields of a record as a tuple in one C-level call
+txn_values = attrgetter(*TXN_FIELDS)
+
+def field_names(record):
+    """Column names of a record, in declaration order."""
+    return [f.name for f in fields(record)]